@@ -84,16 +84,17 @@ class Builder:
 
         # Get the names of the required Python modules, extension modules and
         # libraries.
-        metadata = get_python_metadata(project.python_target_version)
+        metadata = get_python_metadata(project.python_target_version,
+                self._target)
         required_modules, required_libraries = project.get_stdlib_requirements(
                 include_hidden=True)
 
         required_py = {}
         required_ext = {}
         for name in required_modules.keys():
-            module = metadata[name]
-
-            if module.target and not self._target.is_targeted(module.target):
+            # The module will be missing if it isn't targeted.
+            module = metadata.get(name)
+            if module is None:
                 continue
 
             if module.source is None:
@@ -739,9 +740,6 @@ class Builder:
         """ Add the building of any standard library extension modules. """
 
         for name, module in required_ext.items():
-            if not self._target.is_targeted(module.target):
-                continue
-
             # See if the extension module should be disabled for a platform
             # because there are no external libraries to link against.
             skip_module = False
@@ -766,11 +764,10 @@ class Builder:
 
                     used_includepath.add(source_dir + '/Modules')
 
-            if module.defines is not None:
-                for define in module.defines:
-                    define = self._get_scoped_value(define)
-                    if define is not None:
-                        used_defines.add(define)
+            for define in module.defines:
+                define = self._get_scoped_value(define)
+                if define is not None:
+                    used_defines.add(define)
 
             if module.includepath is not None:
                 for includepath in module.includepath:
@@ -780,11 +777,10 @@ class Builder:
                                 includepath)
                         used_includepath.add(includepath)
 
-            if module.libs is not None:
-                for lib in module.libs:
-                    lib = self._get_scoped_value(lib)
-                    if lib is not None:
-                        used_libs.add(lib)
+            for lib in module.libs:
+                lib = self._get_scoped_value(lib)
+                if lib is not None:
+                    used_libs.add(lib)
 
             if module.pyd is not None and target_platform == 'win':
                 used_dlls.add(module)
@@ -25,6 +25,8 @@
 
 
 import os
+from bisect import bisect_right
+from functools import lru_cache
 
 from PyQt5.QtCore import QDir, QFile, QFileInfo, QIODevice
 
@@ -149,17 +151,34 @@ def get_embedded_file_for_version(version, root, *subdirs):
     root.  An empty string is returned if the version is not supported.
     """
 
-    best_version = 0
-    best_name = ''
+    versions, names = _get_versioned_file_names(root, *subdirs)
+
+    i = bisect_right(versions, version)
+
+    return names[i - 1] if i != 0 else ''
+
+
+@lru_cache(maxsize=None)
+def _get_versioned_file_names(root, *subdirs):
+    """ Return a 2-tuple of the sorted encoded versions of the files in an
+    embedded directory and the corresponding absolute file names.  Files
+    without a version number are ignored.  root is the root directory and will
+    be the __file__ attribute of a pyqtdeploy module.  subdirs is a sequence of
+    sub-directories from the root.
+    """
+
+    versioned_names = []
 
     for name in get_embedded_file_names(root, *subdirs):
-        this_version = extract_version(name)
+        version = extract_version(name)
+
+        if version != 0:
+            versioned_names.append((version, name))
 
-        if this_version <= version and this_version > best_version:
-            best_version = this_version
-            best_name = name
+    versioned_names.sort()
 
-    return best_name
+    return (tuple(version for version, _ in versioned_names),
+            tuple(name for _, name in versioned_names))
 
 
 def extract_version(name):
@@ -28,6 +28,12 @@ __all__ = ['ExtensionModule', 'get_python_metadata', 'get_targeted_value',
         'supported_python_versions']
 
 
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
+
+
 # The latest supported version in each minor branch.
 _supported_branches = (
     (3, 7, 2),
@@ -47,20 +53,76 @@ def _get_supported_versions():
 supported_python_versions = tuple(_get_supported_versions())
 
 
+def _version_from_tuple(version):
+    """ Convert a 3-tuple version to an integer. """
+
+    return (version[0] << 16) + (version[1] << 8) + version[2]
+
+
+def _version_to_tuple(nr):
+    """ Convert an integer version to a 3-tuple. """
+
+    return ((nr >> 16) & 0xff, (nr >> 8) & 0xff, nr & 0xff)
+
+
+def _as_tuple(value):
+    """ Return a value as a tuple given a single string or a sequence. """
+
+    return (value, ) if type(value) is str else value
+
+
+# The shared tuples of interned module names.
+_interned_names = {}
+
+
+def _intern_names(names):
+    """ Return a tuple of interned module names given a name or a sequence of
+    names.  The names are interned because they are used as keys when looking
+    up meta-data.  Identical tuples are shared.
+    """
+
+    names = _as_tuple(names)
+
+    interned = _interned_names.get(names)
+    if interned is None:
+        interned = tuple(sys.intern(name) for name in names)
+        _interned_names[interned] = interned
+
+    return interned
+
+
+# The flags that describe a StdlibModule.
+_INTERNAL = 0x01
+_CORE = 0x02
+_BUILTIN = 0x04
+
+
 class StdlibModule:
     """ Encapsulate the meta-data for a module in the standard library. """
 
+    __slots__ = ('_flags', 'target', 'deps', 'hidden_deps', 'defines', 'xlib',
+            'modules', 'source', 'libs', 'includepath', 'pyd', 'dlls')
+
     def __init__(self, internal, target, deps, hidden_deps, core, builtin, defines, xlib, modules, source, libs, includepath, pyd, dlls):
         """ Initialise the object. """
 
-        # Set if the module is internal.
-        self.internal = internal
+        # The boolean attributes are packed into a single value.
+        self._flags = 0
+
+        if internal:
+            self._flags |= _INTERNAL
+
+        if core:
+            self._flags |= _CORE
+
+        if builtin:
+            self._flags |= _BUILTIN
 
         # The target platform(s) of the module.
         self.target = target
 
         # The sequence of modules that this one is dependent on.
-        self.deps = (deps, ) if isinstance(deps, str) else deps
+        self.deps = _intern_names(deps)
 
         # The sequence of additional modules that this one is dependent on.
         # These dependencies are hidden from the user and (most importantly)
@@ -68,37 +130,28 @@ class StdlibModule:
         # module in Python v3 which is a dependency of the core (for a simple
         # function that should never be called) but drags in a lot of other
         # stuff.
-        self.hidden_deps = (hidden_deps, ) if isinstance(hidden_deps, str) else hidden_deps
-
-        # Set if the module is always compiled in to the interpreter library
-        # (if it is an extension module) or if it is required (if it is a
-        # Python module).
-        self.core = core
-
-        # Set if the module is a core Python module that is embedded as a
-        # builtin.
-        self.builtin = builtin
+        self.hidden_deps = _intern_names(hidden_deps)
 
         # The sequence of (possibly scoped) DEFINES to add to the .pro file.
-        self.defines = (defines, ) if isinstance(defines, str) else defines
+        self.defines = _as_tuple(defines)
 
         # The internal identifier of a required external library.
         self.xlib = xlib
 
         # The sequence of modules or sub-packages if this is a package,
         # otherwise None.
-        self.modules = (modules, ) if isinstance(modules, str) else modules
+        self.modules = None if modules is None else _intern_names(modules)
 
         # The sequence of (possibly scoped) source files relative to the
         # Modules directory if this is an extension module, otherwise None.
-        self.source = (source, ) if isinstance(source, str) else source
+        self.source = _as_tuple(source)
 
         # The sequence of (possibly scoped) LIBS to add to the .pro file.
-        self.libs = (libs, ) if isinstance(libs, str) else libs
+        self.libs = _as_tuple(libs)
 
         # The sequence of (possibly scoped) directories relative to the Modules
         # directory to add to INCLUDEPATH.
-        self.includepath = (includepath, ) if isinstance(includepath, str) else includepath
+        self.includepath = _as_tuple(includepath)
 
         # The name of the extension module if it is implemented as a .pyd file
         # included in the Windows installer from python.org.
@@ -106,33 +159,114 @@ class StdlibModule:
 
         # The sequence of additional DLLs needed by the extension module and
         # included in the Windows installer from python.org.
-        self.dlls = (dlls, ) if isinstance(dlls, str) else dlls
+        self.dlls = _as_tuple(dlls)
+
+    @property
+    def builtin(self):
+        """ Set if the module is a core Python module that is embedded as a
+        builtin.
+        """
+
+        return bool(self._flags & _BUILTIN)
+
+    @property
+    def core(self):
+        """ Set if the module is always compiled in to the interpreter library
+        (if it is an extension module) or if it is required (if it is a Python
+        module).
+        """
+
+        return bool(self._flags & _CORE)
+
+    @property
+    def internal(self):
+        """ Set if the module is internal. """
+
+        return bool(self._flags & _INTERNAL)
 
 
 class VersionedModule:
     """ Encapsulate the meta-data common to all types of module. """
 
-    def __init__(self, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), core=False, builtin=False, defines=None, xlib=None, modules=None, source=None, libs=None, includepath=None, pyd=None, dlls=None):
+    __slots__ = ('min_nr', 'max_nr', '_args', '_module')
+
+    # StdlibModule instances are read-only so identical ones are shared.
+    _stdlib_modules = {}
+
+    # The encoded version ranges.  Only a few different ranges are used.
+    _version_ranges = {}
+
+    def __init__(self, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), core=False, builtin=False, defines=(), xlib=None, modules=None, source=None, libs=(), includepath=None, pyd=None, dlls=None):
         """ Initialise the object. """
 
         # A meta-datum is uniquely identified by a range of version numbers.  A
         # version number is a 3-tuple of major, minor and patch number.  It is
-        # an error if version numbers for a particular module overlaps.
-        if version is None:
-            if min_version is None:
-                min_version = 2
+        # an error if version numbers for a particular module overlaps.  The
+        # range is held as a pair of encoded version numbers so that
+        # comparisons are cheap.
+        self.min_nr, self.max_nr = self._get_version_range(min_version,
+                version, max_version)
+
+        # The StdlibModule is only created when it is first needed, ie. when
+        # this version is selected.
+        self._args = (internal, target, deps, hidden_deps, core, builtin,
+                defines, xlib, modules, source, libs, includepath, pyd, dlls)
+        self._module = None
+
+    @property
+    def max_version(self):
+        """ The maximum version as a 3-tuple. """
+
+        return _version_to_tuple(self.max_nr)
+
+    @property
+    def min_version(self):
+        """ The minimum version as a 3-tuple. """
+
+        return _version_to_tuple(self.min_nr)
+
+    @property
+    def module(self):
+        """ The StdlibModule instance. """
+
+        if self._module is None:
+            module = self._stdlib_modules.get(self._args)
+            if module is None:
+                module = StdlibModule(*self._args)
+                self._stdlib_modules[self._args] = module
+
+            self._module = module
+            self._args = None
+
+        return self._module
+
+    @classmethod
+    def _get_version_range(cls, min_version, version, max_version):
+        """ Return the 2-tuple of encoded minimum and maximum version numbers
+        given the arguments of a VersionedModule.
+        """
+
+        key = (min_version, version, max_version)
 
-            if max_version is None:
-                max_version = 3
-        else:
-            min_version = max_version = version
+        version_range = cls._version_ranges.get(key)
+        if version_range is None:
+            if version is None:
+                if min_version is None:
+                    min_version = 2
 
-        self.min_version = self._expand_version(min_version, 0)
-        self.max_version = self._expand_version(max_version, 255)
+                if max_version is None:
+                    max_version = 3
+            else:
+                min_version = max_version = version
 
-        self.module = StdlibModule(internal, target, deps, hidden_deps, core,
-                builtin, defines, xlib, modules, source, libs, includepath,
-                pyd, dlls)
+            version_range = (
+                    _version_from_tuple(cls._expand_version(min_version, 0)),
+                    _version_from_tuple(
+                            cls._expand_version(max_version, 255)))
+
+            cls._version_ranges[key] = version_range
+
+        return version_range
 
     @staticmethod
     def _expand_version(version, default):
@@ -152,7 +286,9 @@ class VersionedModule:
 class ExtensionModule(VersionedModule):
     """ Encapsulate the meta-data for a single extension module. """
 
-    def __init__(self, source, libs=None, includepath=None, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), core=False, defines=None, xlib=None, pyd=None, dlls=None):
+    __slots__ = ()
+
+    def __init__(self, source, libs=(), includepath=None, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), core=False, defines=(), xlib=None, pyd=None, dlls=None):
         """ Initialise the object. """
 
         super().__init__(min_version=min_version, version=version,
@@ -168,6 +304,8 @@ class CoreExtensionModule(ExtensionModule):
     relies on and modules that can only be build with Py_BUILD_CORE defined.
     """
 
+    __slots__ = ()
+
     def __init__(self, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=()):
         """ Initialise the object. """
 
@@ -179,6 +317,8 @@ class CoreExtensionModule(ExtensionModule):
 class PythonModule(VersionedModule):
     """ Encapsulate the meta-data for a single Python module. """
 
+    __slots__ = ()
+
     def __init__(self, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), core=False, builtin=False, modules=None):
         """ Initialise the object. """
 
@@ -193,6 +333,8 @@ class CorePythonModule(PythonModule):
     by an application.
     """
 
+    __slots__ = ()
+
     def __init__(self, min_version=None, version=None, max_version=None, internal=False, target='', deps=(), hidden_deps=(), builtin=False, modules=None):
         """ Initialise the object. """
 
@@ -207,18 +349,54 @@ class CodecModule(PythonModule):
     in the encodings package.
     """
 
+    __slots__ = ()
+
     def __init__(self, min_version=None, version=None, max_version=None, target='', deps=(), core=False):
         """ Initialise the object. """
 
-        if isinstance(deps, str):
-            deps = (deps, )
-
-        all_deps = ('encodings', 'codecs') + deps
+        all_deps = ('encodings', 'codecs') + _as_tuple(deps)
 
         super().__init__(min_version=min_version, version=version,
                 max_version=max_version, target=target, deps=all_deps, core=core)
 
 
+class _VersionedModules:
+    """ Encapsulate the different versions of the meta-data for a module. """
+
+    __slots__ = ('_versioned_modules', '_min_nrs')
+
+    def __init__(self, versioned_modules):
+        """ Initialise the object. """
+
+        # The versions are sorted by their minimum version number so that the
+        # candidate for a particular version can be found by bisection.
+        self._versioned_modules = tuple(
+                sorted(versioned_modules, key=lambda vm: vm.min_nr))
+
+        self._min_nrs = tuple(vm.min_nr for vm in self._versioned_modules)
+
+    def __iter__(self):
+        """ Return an iterator over the VersionedModule instances. """
+
+        return iter(self._versioned_modules)
+
+    def for_version(self, nr):
+        """ Return the VersionedModule instance for a version number or None
+        if the module is not part of that version.
+        """
+
+        i = bisect_right(self._min_nrs, nr)
+        if i == 0:
+            return None
+
+        versioned_module = self._versioned_modules[i - 1]
+
+        if nr > versioned_module.max_nr:
+            return None
+
+        return versioned_module
+
+
 # The encodings modules.
 _encodings_modules = (
     'encodings.ascii', 'encodings.base64_codec', 'encodings.big5',
@@ -5056,38 +5234,34 @@ _metadata = {
         PythonModule(internal=True, deps='xml.sax'),
 }
 
+# Intern the module names and wrap the versions of each module's meta-data so
+# that every value has the same type.  The result is read-only.
+_metadata = MappingProxyType({
+        sys.intern(name): _VersionedModules(
+                versions if isinstance(versions, tuple) else (versions, ))
+        for name, versions in _metadata.items()})
 
-# Meta-data is read-only so we cache and re-use it if possible.
-_metadata_cache = {}
 
-
-def get_python_metadata(version):
+# Meta-data is read-only so we cache and re-use it.
+@lru_cache(maxsize=None)
+def get_python_metadata(version, target=None):
     """ Return the dict of StdlibModule instances for a particular version of
-    Python.  It is assumed that the version is valid.
+    Python.  If a target architecture is given then only those modules that
+    are targeted by it are included.  It is assumed that the version is valid.
     """
 
-    nr = _version_from_tuple(version)
-
-    # Use the cached value if there is one.
-    version_metadata = _metadata_cache.get(nr)
-    if version_metadata is not None:
-        return version_metadata
+    if target is not None:
+        return {name: module
+                for name, module in get_python_metadata(version).items()
+                        if target.is_targeted(module.target)}
 
-    _metadata_cache[nr] = version_metadata = {}
+    nr = _version_from_tuple(version)
+    version_metadata = {}
 
     for name, versions in _metadata.items():
-        if not isinstance(versions, tuple):
-            versions = (versions, )
-
-        for versioned_module in versions:
-            min_nr = _version_from_tuple(versioned_module.min_version)
-
-            if nr >= min_nr:
-                max_nr = _version_from_tuple(versioned_module.max_version)
-
-                if nr <= max_nr:
-                    version_metadata[name] = versioned_module.module
-                    break
+        versioned_module = versions.for_version(nr)
+        if versioned_module is not None:
+            version_metadata[name] = versioned_module.module
 
     return version_metadata
 
@@ -5108,84 +5282,74 @@ def get_targeted_value(value, target):
     return value
 
 
-def _version_from_tuple(version):
-    """ Convert a 3-tuple version to an integer. """
-
-    return (version[0] << 16) + (version[1] << 8) + version[2]
-
-
 if __name__ == '__main__':
 
-    def check_modules(names, metadata, unused):
-        """ Sanity check a list of module names. """
+    def check_modules(names, metadata, used):
+        """ Sanity check a list of module names and add them to the set of
+        used modules.
+        """
 
         for name in names:
             if name[0] in '?!':
                 name = name[1:]
 
-            module = metadata.get(name)
-            if module is None:
+            if name in metadata:
+                used.add(name)
+            else:
                 print("Unknown module '{0}'".format(name))
-                continue
 
-            try:
-                del unused[name]
-            except KeyError:
-                pass
+    def check_version_numbers():
+        """ Carry out sanity checks on the version numbers of all modules. """
 
-    def check_version(major, minor, patch=0):
-        """ Carry out sanity checks for a particular version of Python. """
-
-        print("Checking Python v{0}.{1}.{2}...".format(major, minor, patch))
-
-        # Get the meta-data for this version.
-        version_metadata = {}
-        version_nr = _version_from_tuple((major, minor, patch))
+        print("Checking version numbers...")
 
         for name, versions in _metadata.items():
-            if not isinstance(versions, tuple):
-                versions = (versions, )
+            overlapping = False
+            prev_module = None
 
-            # Check the version numbers.
-            matches = []
+            # The versions are sorted by their minimum version number so any
+            # overlap will be with the previous version.
             for module in versions:
-                min_nr = _version_from_tuple(module.min_version)
-                max_nr = _version_from_tuple(module.max_version)
-
-                if min_nr > max_nr:
+                if module.min_nr > module.max_nr:
                     print("Module '{0}' version numbers are swapped".format(name))
 
-                if version_nr >= min_nr and version_nr <= max_nr:
-                    matches.append(module)
+                if prev_module is not None:
+                    if module.min_nr <= prev_module.max_nr:
+                        overlapping = True
+
+                prev_module = module
 
-            nr_matches = len(matches)
+            if overlapping:
+                print("Module '{0}' has overlapping versions".format(name))
 
-            if nr_matches != 1:
-                if nr_matches > 1:
-                    print("Module '{0}' has overlapping versions".format(name))
+    def check_version(major, minor, patch=0):
+        """ Carry out sanity checks for a particular version of Python. """
 
-                continue
+        print("Checking Python v{0}.{1}.{2}...".format(major, minor, patch))
 
-            version_metadata[name] = matches[0]
+        # Get the meta-data for this version.
+        version_metadata = get_python_metadata((major, minor, patch))
 
         # Check all the dependencies and sub-modules exist.
-        unused = version_metadata.copy()
-
-        for name, versioned_module in version_metadata.items():
-            module = versioned_module.module
+        used = set()
 
-            check_modules(module.deps, version_metadata, unused)
+        for name, module in version_metadata.items():
+            check_modules(module.deps, version_metadata, used)
 
             if isinstance(module, PythonModule) and module.modules is not None:
-                check_modules(module.modules, version_metadata, unused)
+                check_modules(module.modules, version_metadata, used)
 
         # See if there are any internal, non-core modules that are unused.
-        for name, versioned_module in unused.items():
-            module = versioned_module.module
+        for name in sorted(version_metadata.keys() - used):
+            module = version_metadata[name]
 
             if module.internal and not module.core:
                 print("Unused module '{0}'".format(name))
 
+    # Check the version numbers which are independent of any particular
+    # version.
+    check_version_numbers()
+
     # Check each supported version.
     for major, minor, patch in supported_python_versions:
         check_version(major, minor, patch)
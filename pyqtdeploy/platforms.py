@@ -29,6 +29,7 @@ import os
 import struct
 import subprocess
 import sys
+from functools import lru_cache
 
 from .user_exception import UserException
 
@@ -39,6 +40,9 @@ class Platform:
     # The list of all platforms.
     all_platforms = []
 
+    # The platforms keyed by name.
+    _platforms = {}
+
     def __init__(self, full_name, name, archs):
         """ Initialise the object. """
 
@@ -50,6 +54,7 @@ class Platform:
             arch_factory(arch_name, self)
 
         self.all_platforms.append(self)
+        self._platforms[name] = self
 
     def configure(self):
         """ Configure the platform for building. """
@@ -84,17 +89,23 @@ class Platform:
         UserException is raised if the platform is unsupported.
         """
 
-        for platform in cls.all_platforms:
-            if platform.name == name:
-                return platform
+        platform = cls._platforms.get(name)
+        if platform is None:
+            raise UserException(
+                    "'{0}' is not a supported platform.".format(name))
 
-        raise UserException("'{0}' is not a supported platform.".format(name))
+        return platform
 
     @staticmethod
     def run(*args, message_handler, capture=False):
         """ Run a command, optionally capturing stdout. """
 
-        message_handler.verbose_message("Running '{0}'".format(' '.join(args)))
+        # Avoid building messages that would be discarded.
+        verbose = message_handler.verbose
+
+        if verbose:
+            message_handler.verbose_message(
+                    "Running '{0}'".format(' '.join(args)))
 
         detail = None
         stdout = []
@@ -102,17 +113,15 @@ class Platform:
         try:
             with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True) as process:
                 try:
-                    while process.poll() is None:
-                        line = process.stdout.readline()
-                        if not line:
-                            continue
-
+                    # Block reading the output until the pipe is closed rather
+                    # than polling the process.
+                    for line in process.stdout:
                         if capture:
                             stdout.append(line)
-                        else:
+                        elif verbose:
                             message_handler.verbose_message(line.rstrip())
 
-                    if process.returncode != 0:
+                    if process.wait() != 0:
                         detail = "returned exit code {}".format(
                                 process.returncode)
 
@@ -133,6 +142,12 @@ class Architecture:
     # The list of all architectures.
     all_architectures = []
 
+    # The architectures keyed by name.
+    _architectures = {}
+
+    # The first architecture of each platform keyed by the platform name.
+    _platform_architectures = {}
+
     def __init__(self, name, platform):
         """ Initialise the object. """
 
@@ -140,6 +155,8 @@ class Architecture:
         self.platform = platform
 
         self.all_architectures.append(self)
+        self._architectures[name] = self
+        self._platform_architectures.setdefault(platform.name, self)
 
     @classmethod
     def architecture(cls, name=None):
@@ -168,19 +185,18 @@ class Architecture:
         elif name.startswith('osx-'):
             # Map the deprecated values.  Such values can only come from the
             # command line.
-            name = 'macos-' + name.split('-')[1]
+            name = 'macos-' + name.partition('-')[2]
 
         # Find the architecture instance.
-        for arch in cls.all_architectures:
-            if arch.name == name:
-                return arch
-
+        arch = cls._architectures.get(name)
+        if arch is None:
             # If it is a platform then use the first architecture.
-            if arch.platform.name == name:
-                return arch
+            arch = cls._platform_architectures.get(name)
+            if arch is None:
+                raise UserException(
+                        "'{0}' is not a supported architecture.".format(name))
 
-        raise UserException(
-                "'{0}' is not a supported architecture.".format(name))
+        return arch
 
     def configure(self):
         """ Configure the architecture for building. """
@@ -203,27 +219,7 @@ class Architecture:
 
         if targets:
             if isinstance(targets, str):
-                # See if the string is a '|' separated list of targets.
-                targets = targets.split('|')
-                if len(targets) == 1:
-                    # There was no '|' so restore the original string.
-                    targets = targets[0]
-
-            if isinstance(targets, str):
-                # String targets can come from the project file (ie. the user)
-                # and so need to be validated.
-                if targets[0] == '!':
-                    # Note that this assumes that the target is a platform
-                    # rather than an architecture.  If this is incorrect then
-                    # it is a bug in the meta-data somewhere.
-                    platform = Platform.platform(targets[1:])
-                    covered = (self.platform is not platform)
-                elif '-' in targets:
-                    architecture = Architecture.architecture(targets)
-                    covered = (self is architecture)
-                else:
-                    platform = Platform.platform(targets)
-                    covered = (self.platform is platform)
+                covered = (self in _targeted_architectures(targets))
             else:
                 covered = (self.platform.name in targets)
         else:
@@ -239,18 +235,93 @@ class Architecture:
         return target is self
 
 
+# The same target strings are used by many modules so they are only parsed
+# once.
+@lru_cache(maxsize=None)
+def _targeted_architectures(targets):
+    """ Return the frozenset of architectures covered by a string of targets.
+    A UserException is raised if the string contains an unsupported platform
+    or architecture.
+    """
+
+    # See if the string is a '|' separated list of targets.
+    if '|' in targets:
+        targets = targets.split('|')
+
+        return frozenset(arch for arch in Architecture.all_architectures
+                if arch.platform.name in targets)
+
+    # String targets can come from the project file (ie. the user) and so need
+    # to be validated.
+    if targets[0] == '!':
+        # Note that this assumes that the target is a platform rather than an
+        # architecture.  If this is incorrect then it is a bug in the meta-data
+        # somewhere.
+        platform = Platform.platform(targets[1:])
+
+        return frozenset(arch for arch in Architecture.all_architectures
+                if arch.platform is not platform)
+
+    if '-' in targets:
+        return frozenset((Architecture.architecture(targets), ))
+
+    platform = Platform.platform(targets)
+
+    return frozenset(arch for arch in Architecture.all_architectures
+            if arch.platform is platform)
+
+
 class ApplePlatform(Platform):
     """ Encapsulate an Apple platform. """
 
-    @staticmethod
-    def find_sdk(sdk_name, message_handler):
+    # The name of the environment variable that specifies the deployment
+    # target and the value to use if it is not set.  These must be set by
+    # sub-classes.
+    DEPLOYMENT_TARGET_ENV_VAR = None
+    DEFAULT_DEPLOYMENT_TARGET = None
+
+    # The paths of the SDKs that have been found keyed by the SDK name.
+    _sdks = {}
+
+    def __init__(self, full_name, name, archs):
+        """ Initialise the object. """
+
+        super().__init__(full_name, name, archs)
+
+        self._original_deployment_target = os.environ.get(
+                self.DEPLOYMENT_TARGET_ENV_VAR)
+
+    def configure(self):
+        """ Configure the platform for building. """
+
+        if self._original_deployment_target is None:
+            # If not set then use the value that Qt uses.
+            os.environ[self.DEPLOYMENT_TARGET_ENV_VAR] = self.DEFAULT_DEPLOYMENT_TARGET
+
+    def deconfigure(self):
+        """ Deconfigure the platform for building. """
+
+        if self._original_deployment_target is None:
+            os.environ.pop(self.DEPLOYMENT_TARGET_ENV_VAR, None)
+        else:
+            os.environ[self.DEPLOYMENT_TARGET_ENV_VAR] = self._original_deployment_target
+
+    @classmethod
+    def find_sdk(cls, sdk_name, message_handler):
         """ Find an SDK to use. """
 
-        sdk = Platform.run('xcrun', '--sdk', sdk_name, '--show-sdk-path',
-                message_handler=message_handler, capture=True)
+        # The SDK will not change during a run so xcrun is only run once for
+        # each SDK.
+        sdk = cls._sdks.get(sdk_name)
+
+        if sdk is None:
+            sdk = Platform.run('xcrun', '--sdk', sdk_name, '--show-sdk-path',
+                    message_handler=message_handler, capture=True)
 
-        if not sdk:
-            raise UserException("A valid SDK could not be found")
+            if not sdk:
+                raise UserException("A valid SDK could not be found")
+
+            cls._sdks[sdk_name] = sdk
 
         return sdk
 
@@ -348,8 +419,8 @@ class Android_arm_32(AndroidArchitecture):
     def gcc_toolchain_cflags(self):
         """ The architecture-specific gcc compiler flags. """
 
-        return ['-march=armv7-a', '-mfloat-abi=softfp', '-mfpu=vfp',
-                '-fno-builtin-memmove', '-mthumb']
+        return ('-march=armv7-a', '-mfloat-abi=softfp', '-mfpu=vfp',
+                '-fno-builtin-memmove', '-mthumb')
 
 
 class Android_arm_64(AndroidArchitecture):
@@ -378,7 +449,7 @@ class Android_arm_64(AndroidArchitecture):
         """ The architecture-specific gcc compiler flags. """
 
         # gcc is never used to for android-64.
-        return []
+        return ()
 
 
 class Android(Platform):
@@ -398,11 +469,19 @@ class Android(Platform):
     def configure(self):
         """ Configure the platform for building. """
 
-        for name in self.REQUIRED_ENV_VARS:
-            if name not in os.environ:
-                raise UserException(
-                        "The {0} environment variable must be set.".format(
-                                name))
+        # Report all the missing environment variables at once.
+        missing = [name for name in self.REQUIRED_ENV_VARS
+                if name not in os.environ]
+
+        if len(missing) == 1:
+            raise UserException(
+                    "The {0} environment variable must be set.".format(
+                            missing[0]))
+
+        if missing:
+            raise UserException(
+                    "The {0} environment variables must be set.".format(
+                            ', '.join(missing)))
 
         self.ndk_root = os.environ['ANDROID_NDK_ROOT']
         self.sdk_root = os.environ['ANDROID_SDK_ROOT']
@@ -458,11 +537,9 @@ class Android(Platform):
                     "NDK r{0} does not support {1}.".format(
                             self.android_ndk_version[0], ndk_platform))
 
-        parts = ndk_platform.split('-')
-
-        if len(parts) == 2 and parts[0] == 'android':
+        if ndk_platform.startswith('android-'):
             try:
-                api = int(parts[1])
+                api = int(ndk_platform[len('android-'):])
             except ValueError:
                 api = None
 
@@ -558,30 +635,16 @@ class iOS_arm_64(Architecture):
 
 class iOS(ApplePlatform):
     """ Encapsulate the iOS platform. """
+
+    # The deployment target.
+    DEPLOYMENT_TARGET_ENV_VAR = 'IPHONEOS_DEPLOYMENT_TARGET'
+    DEFAULT_DEPLOYMENT_TARGET = '8.0'
     
     def __init__(self):
         """ Initialise the object. """
         
         super().__init__("iOS", 'ios', [('ios-64', iOS_arm_64)])
 
-        self._original_deployment_target = os.environ.get(
-                'IPHONEOS_DEPLOYMENT_TARGET')
-
-    def configure(self):
-        """ Configure the platform for building. """
-
-        if self._original_deployment_target is None:
-            # If not set then use the value that Qt uses.
-            os.environ['IPHONEOS_DEPLOYMENT_TARGET'] = '8.0'
-
-    def deconfigure(self):
-        """ Deconfigure the platform for building. """
-
-        if self._original_deployment_target is None:
-            del os.environ['IPHONEOS_DEPLOYMENT_TARGET']
-        else:
-            os.environ['IPHONEOS_DEPLOYMENT_TARGET'] = self._original_deployment_target
-
     def get_apple_sdk(self, message_handler):
         """ The name of the iOS SDK. """
 
@@ -640,30 +703,16 @@ class macOS_x86_64(Architecture):
 
 class macOS(ApplePlatform):
     """ Encapsulate the macOS platform. """
+
+    # The deployment target.
+    DEPLOYMENT_TARGET_ENV_VAR = 'MACOSX_DEPLOYMENT_TARGET'
+    DEFAULT_DEPLOYMENT_TARGET = '10.10'
     
     def __init__(self):
         """ Initialise the object. """
         
         super().__init__("macOS", 'macos', [('macos-64', macOS_x86_64)])
 
-        self._original_deployment_target = os.environ.get(
-                'MACOSX_DEPLOYMENT_TARGET')
-
-    def configure(self):
-        """ Configure the platform for building. """
-
-        if self._original_deployment_target is None:
-            # If not set then use the value that Qt uses.
-            os.environ['MACOSX_DEPLOYMENT_TARGET'] = '10.10'
-
-    def deconfigure(self):
-        """ Deconfigure the platform for building. """
-
-        if self._original_deployment_target is None:
-            del os.environ['MACOSX_DEPLOYMENT_TARGET']
-        else:
-            os.environ['MACOSX_DEPLOYMENT_TARGET'] = self._original_deployment_target
-
     def get_apple_sdk(self, message_handler):
         """ The name of the macOS SDK. """
 
@@ -694,7 +743,8 @@ class WindowsArchitecture(Architecture):
         """
 
         # MSVC2015 is v14 and MSVC2017 is v15.
-        vs_major = os.environ.get('VisualStudioVersion', '0.0').split('.')[0]
+        vs_version = os.environ.get('VisualStudioVersion', '0.0')
+        vs_major = vs_version.partition('.')[0]
 
         if vs_major == '15':
             is_32 = (os.environ.get('VSCMD_ARG_TGT_ARCH') != 'x64')
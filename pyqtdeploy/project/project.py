@@ -210,10 +210,12 @@ class Project(QObject):
         all_modules = {name: _DepState(module)
                 for name, module in metadata.items()}
 
-        visit = 0
-        for name in all_modules.keys():
-            self._set_dependency_state(all_modules, name, visit)
-            visit += 1
+        # Only the modules that are explicitly required or are core modules
+        # need to be followed.  Anything else that is required will be reached
+        # as one of their dependencies.
+        for name, dep_state in all_modules.items():
+            if name in self.standard_library or dep_state.module.core:
+                self._set_dependency_state(all_modules, name)
 
         # Extract the required modules and libraries.
         required_modules = {}
@@ -240,25 +242,26 @@ class Project(QObject):
 
         return required_modules, required_libraries
 
-    def _set_dependency_state(self, all_modules, name, visit, is_dep=False):
-        """ Set a module's dependency state. """
+    def _set_dependency_state(self, all_modules, name):
+        """ Set the dependency state of a required module and of all the
+        modules it depends on.
+        """
 
         dep_state = all_modules[name]
 
-        if dep_state.visit == visit:
+        # Each module is only visited once.
+        if dep_state.visited:
             return
 
-        dep_state.visit = visit
+        dep_state.visited = True
 
         if dep_state.module.builtin:
             # This will mean that the explicit and implicit states will remain
-            # None and so the module will be omitted from the list.
+            # False and so the module will be omitted from the list.
             return
 
         dep_state.explicit = (name in self.standard_library)
-
-        if dep_state.module.core or is_dep:
-            dep_state.implicit = True
+        dep_state.implicit = True
 
         for dep in dep_state.module.deps:
             # If the first character of the module is '?' then it should be
@@ -275,8 +278,7 @@ class Project(QObject):
 
                 dep = dep[1:]
 
-            self._set_dependency_state(all_modules, dep, visit,
-                    (dep_state.explicit or dep_state.implicit))
+            self._set_dependency_state(all_modules, dep)
 
     @classmethod
     def load(cls, file_name):
@@ -788,4 +790,4 @@ class _DepState:
         self.module = module
         self.explicit = False
         self.implicit = False
-        self.visit = -1
+        self.visited = False
@@ -283,7 +283,8 @@ class Sysroot:
         """ The list of the Android toolchain's C compiler's recommended flags.
         """
 
-        return self._target.android_toolchain_cflags
+        # Return a copy as plugins may modify it.
+        return list(self._target.android_toolchain_cflags)
 
     @property
     @android_only